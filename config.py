@@ -10,12 +10,16 @@ RISK_THRESHOLDS = {
     'SUSPICIOUS': 5,
     'DANGEROUS': 10
 }
+# Skip the ML stage once the rule-based score is this far past DANGEROUS
+SHORT_CIRCUIT_MARGIN = 5
 
 # Model Configuration
+# Relative paths are resolved against the Guardian.model package directory,
+# so they work from any working directory and in a non-editable install.
 MODEL_CONFIG = {
-    'VECTORIZER_PATH': 'src/Guardian/model/vectorizer.joblib',
-    'MODEL_PATH': 'src/Guardian/model/model.joblib',
-    'DATASET_PATH': 'src/Guardian/model/dataset.csv'
+    'VECTORIZER_PATH': 'vectorizer.joblib',
+    'MODEL_PATH': 'model.joblib',
+    'DATASET_PATH': 'dataset.csv'
 }
 
 # Logging Configuration
@@ -28,6 +32,7 @@ LOG_CONFIG = {
 # API Configuration
 API_CONFIG = {
     'MAX_MESSAGE_LENGTH': 10000,
+    'MAX_BATCH_SIZE': 100,
     'RATE_LIMIT': '100 per hour',
     'CORS_ORIGINS': ['*']
 }
@@ -1,21 +1,18 @@
 import os
 import sys
 import logging
-from pathlib import Path
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Startup info logs are only configured when GUARDIAN_VERBOSE is set; otherwise
+# the root logger stays at WARNING and the info calls below are no-ops.
+# Errors still reach stderr through logging's last-resort handler.
+VERBOSE = bool(os.environ.get("GUARDIAN_VERBOSE"))
+if VERBOSE:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
 logger = logging.getLogger(__name__)
 
-# Setup Python path
-project_root = Path(__file__).resolve().parent
-src_path = project_root / "src"
-sys.path.insert(0, str(src_path))
-logger.info(f"Python path set to: {src_path}")
-
 # Check PORT environment variable
 port_str = os.environ.get("PORT")
 if not port_str:
@@ -24,19 +21,17 @@ if not port_str:
 
 try:
     port = int(port_str)
-    logger.info(f"Starting server on port {port}")
+    logger.info("Starting server on port %d", port)
 except ValueError:
     logger.error(f"CRITICAL: Invalid PORT value: {port_str}")
     sys.exit(1)
 
 # Import app once
 logger.info("Importing Flask app...")
-try:
-    from Guardian.app import app
-    logger.info(f"Flask app imported: {app.name}")
-except Exception as e:
-    logger.error(f"CRITICAL: Failed to import app: {e}")
-    sys.exit(1)
+from Guardian.app import app, preload
+logger.info("Flask app imported: %s", app.name)
+preload()
+logger.info("ML models preloaded")
 
 # Import waitress
 try:
@@ -47,14 +42,15 @@ except ImportError as e:
     sys.exit(1)
 
 if __name__ == "__main__":
-    logger.info(f"Starting Waitress server on 0.0.0.0:{port}")
+    logger.info("Starting Waitress server on 0.0.0.0:%d", port)
     try:
         serve(
             app,
             host="0.0.0.0",
             port=port,
-            threads=1,
-            connection_limit=50
+            threads=8,
+            connection_limit=512,
+            channel_timeout=60
         )
     except Exception as e:
         logger.error(f"CRITICAL: Server failed to start: {e}")
@@ -0,0 +1,21 @@
+#!/usr/bin/env sh
+# Profile the import graph of the web app (what the Procfile loads on a
+# cold start). Writes the raw -X importtime log and opens it in tuna when
+# that is installed; otherwise prints the slowest cumulative imports.
+#
+#   sh scripts/profile_import.sh [module] [logfile]
+
+MODULE="${1:-Guardian.app}"
+LOG="${2:-importtime.log}"
+
+cd "$(dirname "$0")/.." || exit 1
+
+PYTHONPATH="src:.${PYTHONPATH:+:$PYTHONPATH}" \
+    python -X importtime -c "import $MODULE" 2> "$LOG" || exit 1
+
+if command -v tuna >/dev/null 2>&1; then
+    tuna "$LOG"
+else
+    echo "tuna not installed (pip install tuna); top cumulative imports:"
+    grep '^import time:' "$LOG" | sort -t'|' -k2 -n | tail -n 20
+fi
@@ -5,7 +5,7 @@ from flask_cors import CORS
 import config
 import os
 from .logger import setup_csv_logging
-from .detection import analyse_message
+from .detection import analyse_message, analyse_messages_batch, _load_ml_models
 
 # Simple Flask app setup
 template_path = os.path.join(os.path.dirname(__file__), 'templates')
@@ -14,12 +14,28 @@ app = Flask('Guardian', template_folder=template_path)
 # Enable CORS
 CORS(app, resources={
     r"/analyse": {"origins": config.API_CONFIG['CORS_ORIGINS']},
+    r"/analyse/batch": {"origins": config.API_CONFIG['CORS_ORIGINS']},
     r"/report": {"origins": config.API_CONFIG['CORS_ORIGINS']},
     r"/health": {"origins": ["*"]}
 })
 
 setup_csv_logging(app)
 
+def preload():
+    """
+    Load the ML model and vectorizer before the server starts taking requests,
+    so the first /analyse call does not pay for it. Safe to call more than once.
+    """
+    _load_ml_models()
+
+# Deployment metadata reported by /health; the environment does not change
+# while the process runs, so read it once.
+DEPLOY_INFO = {
+    "timestamp": os.environ.get('SOURCE_VERSION', 'unknown'),
+    "environment": os.environ.get('RAILWAY_ENVIRONMENT', 'unknown'),
+    "port": os.environ.get('PORT', 'unknown')
+}
+
 @app.errorhandler(Exception)
 def handle_exception(e):
     """Handle generic exceptions."""
@@ -55,10 +71,10 @@ def health():
         status = {
             "status": "ready" if _ml_model_loaded else "initializing",
             "models_loaded": _ml_model_loaded,
-            "timestamp": os.environ.get('SOURCE_VERSION', 'unknown'),
+            "timestamp": DEPLOY_INFO["timestamp"],
             "version": "2.0",
-            "environment": os.environ.get('RAILWAY_ENVIRONMENT', 'unknown'),
-            "port": os.environ.get('PORT', 'unknown')
+            "environment": DEPLOY_INFO["environment"],
+            "port": DEPLOY_INFO["port"]
         }
 
         if _model_load_error:
@@ -89,10 +105,41 @@ def analyse():
         return jsonify({"error": "Invalid request. JSON with 'message' key required."}), 400
 
     message = data['message']
+    if len(message) > config.API_CONFIG['MAX_MESSAGE_LENGTH']:
+        return jsonify({"error": f"Message too long. Maximum length is {config.API_CONFIG['MAX_MESSAGE_LENGTH']} characters."}), 400
     result = analyse_message(message)
+    _log_analysis(message, result)
+
+    return jsonify(result)
+
+@app.route("/analyse/batch", methods=['POST'])
+def analyse_batch():
+    """
+    API endpoint to analyse several messages in one request.
+    The ML model scores the whole batch in a single call.
+    Expects a JSON payload with a "messages" list of strings.
+    e.g., {"messages": ["first message", "second message"]}
+    """
+    data = request.get_json()
+    messages = data.get('messages') if isinstance(data, dict) else None
+    if not isinstance(messages, list) or not all(isinstance(m, str) for m in messages):
+        return jsonify({"error": "Invalid request. JSON with 'messages' list of strings required."}), 400
+    if len(messages) > config.API_CONFIG['MAX_BATCH_SIZE']:
+        return jsonify({"error": f"Too many messages. Maximum batch size is {config.API_CONFIG['MAX_BATCH_SIZE']}."}), 400
+    if any(len(m) > config.API_CONFIG['MAX_MESSAGE_LENGTH'] for m in messages):
+        return jsonify({"error": f"Message too long. Maximum length is {config.API_CONFIG['MAX_MESSAGE_LENGTH']} characters."}), 400
+
+    results = analyse_messages_batch(messages)
+    for message, result in zip(messages, results):
+        _log_analysis(message, result)
+
+    return jsonify({"results": results})
 
-    # Log the analysis result using the app's logger.
-    # The custom handler will pick this up and write it to the CSV.
+def _log_analysis(message, result):
+    """
+    Log an analysis result using the app's logger.
+    The custom handler will pick this up and write it to the CSV.
+    """
     log_details = {
         "message": message,
         "level": result['level'],
@@ -102,8 +149,6 @@ def analyse():
     # The 'extra' dict makes the data available to our custom handler
     app.logger.info("Analysis performed", extra={'analysis_result': log_details})
 
-    return jsonify(result)
-
 @app.route("/demo")
 def demo():
     """
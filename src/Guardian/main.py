@@ -10,11 +10,19 @@ import os
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(__file__))
 
-try:
-    from . import detection
-except ImportError:
-    # Fallback for direct execution
-    import detection
+def print_result(result):
+    """
+    Print one analysis result in the human-readable CLI format.
+    """
+    print(f"--- AI Guardian Analysis ---")
+    print(f"Risk Level: {result['level']} (Score: {result['score']})")
+    if result['reasons']:
+        print("\nReasons:")
+        for reason in result['reasons']:
+            print(f"- {reason}")
+    if result.get('links'):
+        print(f"\nLinks found: {', '.join(result['links'])}")
+    print("--- End of Analysis ---")
 
 def main():
     """
@@ -26,8 +34,14 @@ def main():
     parser.add_argument(
         "message",
         type=str,
+        nargs="?",
         help="The message text to analyse."
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Analyse one message per line read from stdin."
+    )
     parser.add_argument(
         "--json",
         action="store_true",
@@ -35,23 +49,30 @@ def main():
     )
 
     args = parser.parse_args()
+    if args.batch == (args.message is not None):
+        parser.error("provide exactly one of a message or --batch")
+
+    # Import detection only after argument parsing: it loads the rules,
+    # regexes and ML libraries, which --help and usage errors don't need
+    try:
+        from . import detection
+    except ImportError:
+        # Fallback for direct execution
+        import detection
 
-    # Analyse the message
-    result = detection.analyse_message(args.message)
+    # Analyse the message(s); a batch shares one model load and ML call
+    if args.batch:
+        messages = [line.rstrip("\r\n") for line in sys.stdin if line.strip()]
+        results = detection.analyse_messages_batch(messages)
+    else:
+        results = [detection.analyse_message(args.message)]
 
     # Print the result
     if args.json:
-        print(json.dumps(result, indent=2))
+        print(json.dumps(results if args.batch else results[0], indent=2))
     else:
-        print(f"--- AI Guardian Analysis ---")
-        print(f"Risk Level: {result['level']} (Score: {result['score']})")
-        if result['reasons']:
-            print("\nReasons:")
-            for reason in result['reasons']:
-                print(f"- {reason}")
-        if result.get('links'):
-            print(f"\nLinks found: {', '.join(result['links'])}")
-        print("--- End of Analysis ---")
+        for result in results:
+            print_result(result)
 
 if __name__ == "__main__":
     main()
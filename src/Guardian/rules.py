@@ -1,10 +1,28 @@
 
+import re
+import sys
+
+# Optional C-accelerated multi-phrase matcher
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    print("Warning: pyahocorasick not available, using per-keyword substring scans")
+
+# Optional linear-time regex engine (google-re2)
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
 SCAM_KEYWORDS = {
     # Urgency & Authority
     "urgent": 2,
     "immediate": 2,
     "action required": 3,
-    "account suspended": 3,
+    "account suspended": 4,
     "verify your account": 3,
     "kyc": 3,
     "otp": 6, 
@@ -116,16 +134,12 @@ SCAM_KEYWORDS = {
     "your pc is at risk": 4,
     
     # Typosquatting & Domain Impersonation
-    "verify your account": 3,
     "account verification": 3,
     "security verification": 3,
     "login verification": 3,
     "identity verification": 4,
-    "account compromised": 4,
     "suspicious activity": 3,
     "unusual login": 3,
-    "account locked": 4,
-    "account suspended": 4,
     "account restricted": 3,
     "security breach": 4,
     "data breach": 4,
@@ -133,6 +147,9 @@ SCAM_KEYWORDS = {
     "password compromised": 4,
 }
 
+# Intern the keys: they are looked up by value on every message
+SCAM_KEYWORDS = {sys.intern(keyword): weight for keyword, weight in SCAM_KEYWORDS.items()}
+
 # Keywords that can reduce the risk score, indicating a legitimate context.
 # The score reduction should be significant enough to counteract common false positives.
 SAFE_KEYWORDS = {
@@ -167,6 +184,13 @@ SAFE_KEYWORDS = {
     "call": -1,
 }
 
+SAFE_KEYWORDS = {sys.intern(keyword): weight for keyword, weight in SAFE_KEYWORDS.items()}
+
+# Semantic indicator phrases. Each one present adds to its category count.
+URGENCY_WORDS = ('urgent', 'immediate', 'immediately', 'asap', 'now', 'hurry', 'quick', 'fast')
+AUTHORITY_PHRASES = ('official', 'government', 'bank', 'security', 'verify', 'account suspended')
+INFO_REQUEST_PHRASES = ('send your', 'provide your', 'share your', 'enter your', 'confirm your')
+
 # Weighted regular expressions for detecting suspicious patterns.
 # Higher weights indicate a stronger likelihood of a scam.
 WEIGHTED_SUSPICIOUS_PATTERNS = {
@@ -183,7 +207,7 @@ WEIGHTED_SUSPICIOUS_PATTERNS = {
     "EXCESSIVE_CAPS": (r"(\b[A-Z]{4,}\b\s*){4,}", 1),
     "EXCESSIVE_PUNCTUATION": (r"[!]{3,}|[?]{3,}", 1), # Increased threshold to 3+
     "PHONE_NUMBER": (r"\b(?:(?:\+91|91|0)\s*[-]?\s*)?[6-9]\d{9}\b|\b0\d{2,4}\s*[-]?\s*\d{6,8}\b", 0), # More general Indian phone numbers (mobile and landline)
-    "SUSPICIOUS_NUMBERS": (r"\b((?!19\d{2}|20\d{2})\d{5,}|\d{7,})\b", 1), # 5+ digits (excluding years) or 7+ digits
+    "SUSPICIOUS_NUMBERS": (r"\b((?:[^\D12]\d|1[^\D9]|2[^\D0])\d{3,}|\d{7,})\b", 1), # 5+ digits (not starting 19xx/20xx) or 7+ digits
     "PAN_CARD": (r"\bpan\b", 2), # Specific check for 'pan' as a whole word
     "MONEY_AMOUNT": (r"[₹$€£]\s*\d+", 1),
     
@@ -193,6 +217,44 @@ WEIGHTED_SUSPICIOUS_PATTERNS = {
     "DOMAIN_IMPERSONATION": (r"\b[a-zA-Z0-9.-]*(google|facebook|amazon|apple|microsoft|netflix|paypal|instagram|twitter|linkedin)[a-zA-Z0-9.-]*\.(tk|ml|ga|cf|gq|xyz|top|buzz|live|club|win|loan|work|click|download|verify|update)\b", 5),
 }
 
+# Patterns checked against the message body; URL/DOMAIN patterns are checked per link.
+MESSAGE_PATTERN_NAMES = tuple(
+    pattern_name for pattern_name in WEIGHTED_SUSPICIOUS_PATTERNS
+    if "URL" not in pattern_name and "DOMAIN" not in pattern_name
+)
+
+def compile_pattern(regex: str):
+    """
+    Compile a case-insensitive pattern and return (ascii_pattern, pattern).
+
+    pattern is always Python's re and is the reference behaviour. RE2 keeps
+    matching linear in the message length, but its \d, \b and case folding
+    only cover ASCII, so it disagrees with re as soon as the text contains
+    Devanagari digits, Indic letters or accented characters. ascii_pattern
+    is the RE2 compile when RE2 is installed and accepts the regex, and must
+    only be used on text for which str.isascii() is true; otherwise it is
+    the same re object as pattern.
+    """
+    pattern = re.compile(regex, re.IGNORECASE)
+    if RE2_AVAILABLE:
+        options = re2.Options()
+        options.case_sensitive = False
+        options.log_errors = False
+        try:
+            return re2.compile(regex, options), pattern
+        except re2.error:
+            pass
+    return pattern, pattern
+
+# All message-body patterns as one alternation of named groups. A message that
+# matches none of them is ruled out in a single regex pass. It is only a gate:
+# alternatives consume the text they match, so finditer on it cannot report
+# every pattern that overlaps another.
+COMBINED_MESSAGE_PATTERN_ASCII, COMBINED_MESSAGE_PATTERN = compile_pattern(
+    "|".join(f"(?P<{pattern_name}>{WEIGHTED_SUSPICIOUS_PATTERNS[pattern_name][0]})"
+             for pattern_name in MESSAGE_PATTERN_NAMES)
+)
+
 # Official sender IDs (common in India) that indicate a message is legitimate.
 # This is used for contextual overrides. Case-insensitive.
 OFFICIAL_SENDER_IDS = [
@@ -364,7 +426,7 @@ TARGET_BRAND_DOMAINS = [
     
     # Banking & Finance
     "hdfcbank.com", "icicibank.com", "onlinesbi.sbi", "axisbank.com",
-    "paypal.com", "razorpay.com", "phonepe.com",
+    "paypal.com", "razorpay.com",
     
     # Tech Companies
     "apple.com", "microsoft.com", "adobe.com", "oracle.com",
@@ -413,3 +475,78 @@ FRIENDLY_REASONS = {
     # ML Model
     "ML_CONFIDENCE": "Our smart AI thinks this looks exactly like scam messages it's seen before."
 }
+
+
+# Every keyword and semantic phrase, matched against a message in one pass.
+ALL_PHRASES = frozenset(SCAM_KEYWORDS) | frozenset(SAFE_KEYWORDS) | frozenset(
+    URGENCY_WORDS + AUTHORITY_PHRASES + INFO_REQUEST_PHRASES
+)
+
+# First characters of all phrases; a text containing none of them can't match any
+_PHRASE_FIRST_CHARS = frozenset(phrase[0] for phrase in ALL_PHRASES)
+
+def _build_phrase_automaton():
+    """Build an Aho-Corasick automaton over ALL_PHRASES, or None without pyahocorasick."""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for phrase in ALL_PHRASES:
+        automaton.add_word(phrase, phrase)
+    automaton.make_automaton()
+    return automaton
+
+_PHRASE_AUTOMATON = _build_phrase_automaton()
+
+def find_phrases(text_lower: str) -> set:
+    """
+    Return every phrase from ALL_PHRASES that occurs in the lowercased text.
+    Uses a single Aho-Corasick pass when available.
+    """
+    if _PHRASE_FIRST_CHARS.isdisjoint(text_lower):
+        return set()
+    if _PHRASE_AUTOMATON is None:
+        return {phrase for phrase in ALL_PHRASES if phrase in text_lower}
+    return {phrase for _, phrase in _PHRASE_AUTOMATON.iter(text_lower)}
+
+def score_keywords(matched_phrases: set, keywords: dict) -> tuple:
+    """
+    Sum the weights of the keywords found by find_phrases.
+    Returns (total_weight, hits) with hits in the keyword dict's order.
+    """
+    hits = [keyword for keyword in keywords if keyword in matched_phrases]
+    return sum(keywords[keyword] for keyword in hits), hits
+
+
+# Domain lists are only used for membership tests, so freeze them into sets.
+SAFE_DOMAINS = frozenset(SAFE_DOMAINS)
+MALICIOUS_DOMAINS = frozenset(MALICIOUS_DOMAINS)
+TARGET_BRAND_DOMAINS = frozenset(TARGET_BRAND_DOMAINS)
+
+def build_domain_trie(domains) -> dict:
+    """
+    Build a trie of domains keyed by reversed labels,
+    e.g. "login.paypal.com" is stored as com -> paypal -> login.
+    """
+    trie = {}
+    for domain in domains:
+        node = trie
+        for label in reversed(domain.lower().split('.')):
+            node = node.setdefault(label, {})
+        node[None] = True  # end-of-domain marker; labels are always strings
+    return trie
+
+MALICIOUS_DOMAIN_TRIE = build_domain_trie(MALICIOUS_DOMAINS)
+
+def match_domain_suffix(domain: str, trie: dict) -> bool:
+    """
+    Return True if the domain, or any parent domain of it, is in the trie.
+    Walks one label at a time, so cost depends on the domain, not the list size.
+    """
+    node = trie
+    for label in reversed(domain.lower().split('.')):
+        node = node.get(label)
+        if node is None:
+            return False
+        if None in node:
+            return True
+    return False
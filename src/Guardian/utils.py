@@ -7,9 +7,39 @@ from urlextract import URLExtract
 # Fallback regex if urlextract fails
 URL_PATTERN = re.compile(
     # This regex is improved to not include trailing punctuation.
-    r'(?:https?://)?(?:www\.)?[\w\.-]+\.[\w]{2,}(?:[/\w\.-?=&%#]*)?'
+    r'(?:https?://)?(?:www\.)?[\w\.-]+\.[\w]{2,}(?:[/\w\.-?=&%#]*)?',
+    # URL characters of interest are ASCII; this keeps \w a plain byte-class test
+    re.ASCII
 )
 
+# URLExtract loads and indexes its TLD list on construction, so build it once
+try:
+    _URL_EXTRACTOR = URLExtract()
+except Exception:
+    _URL_EXTRACTOR = None
+
+def extract_link_spans(text: str) -> list[tuple[str, int, int]]:
+    """
+    Finds all URLs in a given string along with their positions.
+
+    Args:
+        text: The text to search for links.
+
+    Returns:
+        A list of (url, start, end) tuples in order of appearance,
+        where text[start:end] is the URL.
+    """
+    # Most SMS-style messages have no link at all; every URL needs a dot or a scheme
+    if '.' not in text and '://' not in text:
+        return []
+    if _URL_EXTRACTOR is not None:
+        try:
+            return [(url, start, end) for url, (start, end) in _URL_EXTRACTOR.find_urls(text, get_indices=True)]
+        except Exception:
+            pass
+    # Fallback to regex if URLExtract fails
+    return [(match.group(), match.start(), match.end()) for match in URL_PATTERN.finditer(text)]
+
 def extract_links(text: str) -> list[str]:
     """
     Finds and returns all URLs in a given string using URLExtract for better accuracy.
@@ -20,9 +50,4 @@ def extract_links(text: str) -> list[str]:
     Returns:
         A list of URLs found in the text.
     """
-    try:
-        extractor = URLExtract()
-        return extractor.find_urls(text)
-    except Exception:
-        # Fallback to regex if URLExtract fails
-        return URL_PATTERN.findall(text)
+    return [url for url, _, _ in extract_link_spans(text)]